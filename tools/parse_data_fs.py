@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+"""离线解析 data.fs 镜像的小工具。
+
+不经过服务器，直接按照 src/server/filesystem 中定义的磁盘布局解析 backing file：
+[0] superblock，[inodeTableStart..] inode 表，[freeBitmapStart..] 空闲块位图，
+[dataBlockStart..] 数据块区域。
+
+用法：
+    python3 tools/parse_data_fs.py info <image>        # 打印 superblock 与位图统计
+    python3 tools/parse_data_fs.py ls <image> <path>   # 列出目录项
+    python3 tools/parse_data_fs.py cat <image> <path>  # 输出文件内容
+"""
+
+import argparse
+import functools
+from array import array
+from dataclasses import dataclass
+import mmap
+import os
+import struct
+import sys
+
+try:
+    import numpy as np
+except ImportError:  # numpy 只是加速用的可选依赖
+    np = None
+
+try:
+    import numba
+except ImportError:  # numba 同样是可选依赖，只影响超大镜像的统计速度
+    numba = None
+
+# 256 项 popcount 查找表：LUT[byte] == bin(byte).count("1")，供向量化统计用
+_POPCNT_LUT = (np.array([bin(i).count("1") for i in range(256)], dtype=np.uint32)
+               if np is not None else None)
+
+if numba is not None and np is not None:
+    @numba.njit(parallel=True, cache=True)
+    def _popcount_bytes(buf):
+        # 多线程逐字节查表累加；prange 归约由 numba 自动处理
+        total = numba.uint64(0)
+        for i in numba.prange(buf.shape[0]):
+            total += _POPCNT_LUT[buf[i]]
+        return total
+else:
+    _popcount_bytes = None
+
+# 与 C++ 侧保持一致的磁盘布局常量（见 superblock.hpp / inode.hpp / vfs.hpp）
+FS_MAGIC = 0x20251205
+
+# SuperBlock：11 个 uint32，小端，无填充
+SUPERBLOCK_STRUCT = struct.Struct("<11I")
+
+# Inode：uint32 id + bool(1 字节，3 字节填充) + uint32 size + 8 个直接块指针
+INODE_STRUCT = struct.Struct("<IB3xI8I")
+INODE_SIZE = INODE_STRUCT.size
+MAX_DIRECT_BLOCKS = 8
+
+# DirEntry：uint32 inodeId + char name[60]，inodeId == 0 表示空槽
+DIRENTRY_STRUCT = struct.Struct("<I60s")
+DIRENTRY_SIZE = DIRENTRY_STRUCT.size
+
+# 与 INODE_STRUCT 等价的 numpy 结构化 dtype（44 字节，含 bool 后的 3 字节填充），
+# 装了 numpy 时整张 inode 表一次性按列解析，逐 inode 读取退化为数组取行
+INODE_DTYPE = (np.dtype([("id", "<u4"), ("isdir", "?"), ("pad", "V3"),
+                         ("size", "<u4"), ("direct", "<u4", (8,))])
+               if np is not None else None)
+
+
+class SuperBlock:
+    """superblock.hpp 中 SuperBlock 的只读镜像。"""
+
+    def __init__(self, raw):
+        (self.magic,
+         self.blockSize,
+         self.totalBlocks,
+         self.inodeTableStart,
+         self.inodeTableBlocks,
+         self.inodeCount,
+         self.freeBitmapStart,
+         self.freeBitmapBlocks,
+         self.dataBlockStart,
+         self.dataBlockCount,
+         self.rootInodeId) = SUPERBLOCK_STRUCT.unpack_from(raw)
+
+
+@dataclass(frozen=True, slots=True)
+class Inode:
+    """inode.hpp 中 Inode 的只读镜像（解析后不可变）。"""
+
+    id: int
+    is_directory: bool
+    size: int
+    direct: tuple  # 固定 8 个直接块指针
+
+
+def read_block(mv, sb, block_id):
+    """返回一个逻辑块的零拷贝切片（背后是 mmap 的页缓存）。"""
+    offset = block_id * sb.blockSize
+    assert offset + sb.blockSize <= len(mv), f"block {block_id} out of image"
+    return mv[offset:offset + sb.blockSize]
+
+
+def inode_offset(sb, inode_id):
+    """inode 相对 inode 表起始处的字节偏移（通用版）。
+
+    与 Vfs::loadInode 一致：inode 表按块组织，每块放
+    blockSize // INODE_SIZE 个 inode，块尾可能有几字节填充。
+    挂载后热路径走 compile_inode_offset 生成的特化版本。
+    """
+    inodes_per_block = sb.blockSize // INODE_SIZE
+    block_index = inode_id // inodes_per_block
+    index_in_block = inode_id % inodes_per_block
+    return block_index * sb.blockSize + index_in_block * INODE_SIZE
+
+
+def compile_inode_offset(sb):
+    """生成把当前镜像的布局常量内联为字面量的 inode_offset 特化版本。
+
+    blockSize 与 INODE_SIZE 在 superblock 读出后就是常量，用 exec 做一次
+    部分求值，热路径上的偏移计算只剩对字面量的整除/取余与乘加，
+    没有任何属性查找。语义与 inode_offset 完全一致。
+    """
+    inodes_per_block = sb.blockSize // INODE_SIZE
+    src = ("def _inode_off(inode_id):\n"
+           f"    return inode_id // {inodes_per_block} * {sb.blockSize}"
+           f" + inode_id % {inodes_per_block} * {INODE_SIZE}\n")
+    namespace = {}
+    exec(src, namespace)
+    return namespace["_inode_off"]
+
+
+def read_inode(table, sb, inode_id):
+    """从常驻内存的 inode 表视图中解析一个 Inode。"""
+    if inode_id >= sb.inodeCount:
+        raise ValueError(f"inode id {inode_id} out of range (count={sb.inodeCount})")
+    offset = _inode_off(inode_id) if _inode_off is not None else inode_offset(sb, inode_id)
+    fields = INODE_STRUCT.unpack_from(table, offset)
+    # fields[3:] 本身就是 tuple，无需再装进 list
+    return Inode(fields[0], bool(fields[1]), fields[2], fields[3:])
+
+
+@functools.lru_cache(maxsize=4096)
+def _decode_name(name_raw):
+    """把定长 60 字节的目录项名字段解码成 str。
+
+    同名字段（重复列同一目录、路径里反复出现的组件）在多次解析间
+    按原始字节串命中缓存，免去重复的 NUL 裁剪和 UTF-8 解码。
+    """
+    nul = name_raw.find(b"\x00")
+    return (name_raw[:nul] if nul >= 0 else name_raw).decode("utf-8", errors="replace")
+
+
+def parse_dir_block(block):
+    """解析一个目录块，返回平行的 (inode_ids, names) 两列，跳过空槽。
+
+    iter_unpack 在 C 层面遍历整个缓冲区，免去逐项 Python 切片与 unpack 调用；
+    列式存储（array('I') + list[str]）省掉每个条目一个 tuple 对象与装箱 int。
+    """
+    inode_ids = array("I")
+    names = []
+    for inode_id, name_raw in DIRENTRY_STRUCT.iter_unpack(block):
+        if inode_id == 0:
+            continue
+        inode_ids.append(inode_id)
+        names.append(_decode_name(name_raw))
+    return inode_ids, names
+
+
+# lru_cache 包装的函数不适合把镜像句柄当参数（缓存键应只含 inode 编号），
+# 因此把当前镜像（mmap 的 memoryview）放在模块级，由 main 通过 mount_image 设置。
+# 工具是只读的，整个进程只处理一个镜像，不需要失效逻辑。
+_mv = None
+_sb = None
+_inode_table = None
+_inode_rows = None  # numpy 可用时为结构化数组，否则为 None
+_inode_off = None   # compile_inode_offset 生成的特化偏移函数
+
+
+def mount_image(mv, sb):
+    """登记当前镜像，供各缓存函数使用，并清空旧缓存。
+
+    inode 表是一段连续区域，挂载时切出一个常驻视图，
+    之后所有 inode 查找都是纯内存 unpack_from，不再逐个访盘。
+    """
+    global _mv, _sb, _inode_table, _inode_rows, _inode_off
+    _mv = mv
+    _sb = sb
+    if mv is None:
+        _inode_table = None
+        _inode_rows = None
+        _inode_off = None
+    else:
+        _inode_off = compile_inode_offset(sb)
+        start = sb.inodeTableStart * sb.blockSize
+        _inode_table = mv[start:start + sb.inodeTableBlocks * sb.blockSize]
+        if np is not None:
+            # 去掉每块尾部的填充字节后，整张表就是 INODE_DTYPE 的顺序数组
+            per_block = (sb.blockSize // INODE_SIZE) * INODE_SIZE
+            raw = np.frombuffer(_inode_table, dtype=np.uint8)
+            raw = raw.reshape(sb.inodeTableBlocks, sb.blockSize)[:, :per_block]
+            _inode_rows = np.ascontiguousarray(raw).view(INODE_DTYPE).reshape(-1)[:sb.inodeCount]
+        else:
+            _inode_rows = None
+    read_inode_cached.cache_clear()
+    _dir_index.cache_clear()
+
+
+@functools.lru_cache(maxsize=1024)
+def read_inode_cached(inode_id):
+    """read_inode 的缓存版本：同一 inode 在一次运行中只解析一次。
+
+    numpy 可用时直接取结构化数组的一行，连 struct.unpack 都省掉。
+    """
+    if _inode_rows is not None:
+        if inode_id >= _sb.inodeCount:
+            raise ValueError(f"inode id {inode_id} out of range (count={_sb.inodeCount})")
+        row = _inode_rows[inode_id]
+        return Inode(int(row["id"]), bool(row["isdir"]), int(row["size"]),
+                     tuple(row["direct"].tolist()))
+    return read_inode(_inode_table, _sb, inode_id)
+
+
+@functools.lru_cache(maxsize=256)
+def _dir_index(block_id):
+    """目录块的 {name: child_inode_id} 索引，按块号缓存。
+
+    路径解析按名字查找，用 dict 把逐项线性扫描换成 O(1) 探查，
+    且每个目录块只解析、建索引一次（宽目录、重复 ls 受益明显）。
+    工具只读，缓存无需失效。
+    """
+    inode_ids, names = parse_dir_block(read_block(_mv, _sb, block_id))
+    return dict(zip(names, inode_ids))
+
+
+def read_dir_entries(inode_id):
+    """返回目录 inode 的 {name: child_inode_id} 映射。"""
+    inode = read_inode_cached(inode_id)
+    if not inode.is_directory:
+        raise ValueError(f"inode {inode_id} is not a directory")
+    return _dir_index(inode.direct[0])
+
+
+def split_path(path):
+    """把 "/a/b/c" 切成 ["a", "b", "c"]，与 Vfs::splitPath 行为一致。
+
+    str.split 走 C 实现，过滤空串即可覆盖多斜杠（"//a//b"）的情况。
+    """
+    return [comp for comp in path.split("/") if comp]
+
+
+def resolve_path(path):
+    """解析绝对路径，返回末尾组件对应的 Inode（而非仅编号）。
+
+    直接返回 Inode，调用方不必在解析后再读一次同一个 inode。
+    """
+    inode = read_inode_cached(_sb.rootInodeId)
+    for comp in split_path(path):
+        if not inode.is_directory:
+            raise ValueError(f"not a directory on path: {comp}")
+        child_id = read_dir_entries(inode.id).get(comp)
+        if child_id is None:
+            raise FileNotFoundError(f"path component not found: {comp}")
+        inode = read_inode_cached(child_id)
+    return inode
+
+
+def list_dir(path):
+    """列出目录项，返回 (inode_id, name) 列表。"""
+    inode = resolve_path(path)
+    if not inode.is_directory:
+        raise ValueError(f"not a directory: {path}")
+    return [(child_id, name) for name, child_id in read_dir_entries(inode.id).items()]
+
+
+def read_file_content(path):
+    """读取整个文件内容，返回 bytes。"""
+    inode = resolve_path(path)
+    if inode.is_directory:
+        raise ValueError(f"is a directory: {path}")
+    # 预分配输出缓冲，峰值内存只有 1 倍文件大小；相邻块号合并成连续区间，
+    # 顺序分配的小文件整个只需一次 memcpy
+    out = bytearray(inode.size)
+    pos = 0
+    run_start = 0  # 当前连续区间的起始块号，0 表示尚未开始
+    run_blocks = 0
+    for block_id in inode.direct:
+        if pos + run_blocks * _sb.blockSize >= inode.size or block_id == 0:
+            break
+        if run_blocks and block_id == run_start + run_blocks:
+            run_blocks += 1
+            continue
+        if run_blocks:
+            take = min(inode.size - pos, run_blocks * _sb.blockSize)
+            offset = run_start * _sb.blockSize
+            out[pos:pos + take] = _mv[offset:offset + take]
+            pos += take
+        run_start = block_id
+        run_blocks = 1
+    if run_blocks and pos < inode.size:
+        take = min(inode.size - pos, run_blocks * _sb.blockSize)
+        offset = run_start * _sb.blockSize
+        out[pos:pos + take] = _mv[offset:offset + take]
+    return bytes(out)
+
+
+def bitmap_stats(mv, sb):
+    """统计空闲块位图中已用/空闲的数据块数量。
+
+    对整个位图区域做 popcount，按可用的依赖逐级加速：装了 numba 时用
+    多线程 JIT 查表内核（数百万数据块的镜像逼近硬件 popcnt 吞吐），
+    只有 numpy 时用 256 项查找表向量化统计，否则退回
+    int.from_bytes + int.bit_count()，三者都不在解释器里逐位循环。
+    """
+    start = sb.freeBitmapStart * sb.blockSize
+    nbytes = (sb.dataBlockCount + 7) // 8
+    bmp = mv[start:start + nbytes]
+    if _popcount_bytes is not None:
+        used = int(_popcount_bytes(np.frombuffer(bmp, dtype=np.uint8)))
+    elif np is not None:
+        used = int(_POPCNT_LUT[np.frombuffer(bmp, dtype=np.uint8)].sum())
+    else:
+        used = int.from_bytes(bmp, "little").bit_count()
+    # 末字节可能包含越界的尾部比特，把多算的部分减掉
+    tail_bits = sb.dataBlockCount % 8
+    if tail_bits:
+        used -= (int(bmp[-1]) >> tail_bits).bit_count()
+    return used, sb.dataBlockCount - used
+
+
+def load_superblock(mv):
+    sb = SuperBlock(mv)
+    if sb.magic != FS_MAGIC:
+        raise ValueError(f"bad magic 0x{sb.magic:08x}, not an OsFinalProject image")
+    return sb
+
+
+def cmd_info(mv, sb):
+    print(f"magic            : 0x{sb.magic:08x}")
+    print(f"blockSize        : {sb.blockSize}")
+    print(f"totalBlocks      : {sb.totalBlocks}")
+    print(f"inodeTableStart  : {sb.inodeTableStart} (+{sb.inodeTableBlocks} blocks, {sb.inodeCount} inodes)")
+    print(f"freeBitmapStart  : {sb.freeBitmapStart} (+{sb.freeBitmapBlocks} blocks)")
+    print(f"dataBlockStart   : {sb.dataBlockStart} (+{sb.dataBlockCount} blocks)")
+    print(f"rootInodeId      : {sb.rootInodeId}")
+    used, free = bitmap_stats(mv, sb)
+    print(f"data blocks used : {used}")
+    print(f"data blocks free : {free}")
+
+
+def cmd_ls(mv, sb, path):
+    lines = []
+    for inode_id, name in list_dir(path):
+        inode = read_inode_cached(inode_id)
+        kind = "d" if inode.is_directory else "-"
+        lines.append(f"{kind} {inode_id:6d} {inode.size:10d} {name}")
+    # 整个列表一次编码、一次写出，避免宽目录下逐行 print 的刷新开销
+    if lines:
+        sys.stdout.buffer.write(("\n".join(lines) + "\n").encode())
+
+
+def cmd_cat(mv, sb, path):
+    sys.stdout.buffer.write(read_file_content(path))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="解析 OsFinalProject 的 data.fs 镜像")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_info = sub.add_parser("info", help="打印 superblock 与位图统计")
+    p_info.add_argument("image")
+
+    p_ls = sub.add_parser("ls", help="列出目录项")
+    p_ls.add_argument("image")
+    p_ls.add_argument("path")
+
+    p_cat = sub.add_parser("cat", help="输出文件内容")
+    p_cat.add_argument("image")
+    p_cat.add_argument("path")
+
+    args = parser.parse_args()
+    fd = os.open(args.image, os.O_RDONLY)
+    try:
+        # 整个镜像映射一次，后续所有读取都是零拷贝切片，不再有 seek/read 系统调用
+        mm = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+    finally:
+        os.close(fd)
+    with mm:
+        mv = memoryview(mm)
+        try:
+            sb = load_superblock(mv)
+            mount_image(mv, sb)
+            if args.command == "info":
+                cmd_info(mv, sb)
+            elif args.command == "ls":
+                cmd_ls(mv, sb, args.path)
+            elif args.command == "cat":
+                cmd_cat(mv, sb, args.path)
+        finally:
+            mount_image(None, None)
+            mv.release()
+
+
+if __name__ == "__main__":
+    main()